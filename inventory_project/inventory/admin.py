@@ -1,11 +1,61 @@
 # inventory/admin.py
 
 from django.contrib import admin
-from .models import Product, ScanHistory, ProductActionLog
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from .models import Product, ScanHistory, ProductActionLog, format_change
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count from PostgreSQL's table statistics
+    instead of running COUNT(*) on every admin page load.
+    Falls back to an exact count for filtered querysets, other databases,
+    or tables that haven't been analyzed yet.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        return super().count
+
+
+class ListDisplayChangeList(ChangeList):
+    """
+    ChangeList that only selects the model fields shown in list_display.
+    Display methods count by their ordering field.
+    """
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        field_names = {field.name for field in self.model._meta.concrete_fields}
+        columns = (
+            getattr(getattr(self.model_admin, name, None), 'admin_order_field', name)
+            for name in self.list_display
+        )
+        return queryset.only(*(name for name in columns if name in field_names))
+
+
+class ListDisplayOnlyMixin:
+    """
+    Narrows changelist queries to the list_display columns.
+    Change forms keep using the full queryset.
+    """
+    def get_changelist(self, request, **kwargs):
+        return ListDisplayChangeList
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ListDisplayOnlyMixin, admin.ModelAdmin):
     """
     Admin interface for Product model.
     Displays stock info and supports searching/filtering.
@@ -13,11 +63,13 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'sku', 'barcode', 'quantity', 'alert_threshold', 'created_at')
     search_fields = ('name', 'sku', 'barcode')
     list_filter = ('quantity', 'alert_threshold', 'created_at')
-    ordering = ('name',)
+    ordering = ('name',)  # backed by product_name_idx
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(ScanHistory)
-class ScanHistoryAdmin(admin.ModelAdmin):
+class ScanHistoryAdmin(ListDisplayOnlyMixin, admin.ModelAdmin):
     """
     Admin interface for ScanHistory model.
     Useful for tracing barcode scans across the system.
@@ -26,10 +78,12 @@ class ScanHistoryAdmin(admin.ModelAdmin):
     search_fields = ('barcode', 'source')
     list_filter = ('source', 'scanned_at')
     ordering = ('-scanned_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(ProductActionLog)
-class ProductActionLogAdmin(admin.ModelAdmin):
+class ProductActionLogAdmin(ListDisplayOnlyMixin, admin.ModelAdmin):
     """
     Admin interface for ProductActionLog model.
     Shows historical actions with change details and metadata.
@@ -39,12 +93,23 @@ class ProductActionLogAdmin(admin.ModelAdmin):
         'product_sku',
         'action',
         'source',
-        'quantity_change',
+        'signed_quantity_change',
         'current_quantity',
-        'threshold_change',
+        'signed_threshold_change',
         'current_threshold',
         'timestamp'
     )
     search_fields = ('product_name', 'product_sku', 'source', 'action')
     list_filter = ('action', 'source', 'timestamp')
     ordering = ('-timestamp',)
+    raw_id_fields = ('product',)  # avoid rendering every product in a <select>
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Quantity change', ordering='quantity_change')
+    def signed_quantity_change(self, obj):
+        return format_change(obj.quantity_change, obj.action, 'quantity')
+
+    @admin.display(description='Threshold change', ordering='threshold_change')
+    def signed_threshold_change(self, obj):
+        return format_change(obj.threshold_change, obj.action, 'threshold')
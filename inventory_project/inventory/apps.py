@@ -1,4 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+
+
 class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "inventory"
+
+    def ready(self):
+        from . import signals
+        signals.connect()
+
+        if getattr(settings, "ASYNC_LOG_WRITES", False):
+            from .log_writer import start_worker
+            start_worker()
@@ -0,0 +1,155 @@
+# inventory/log_writer.py
+
+"""
+Buffered writer for ProductActionLog and ScanHistory rows.
+
+When ASYNC_LOG_WRITES is enabled, views hand their log entries to an
+in-process queue once the surrounding transaction commits. A daemon
+thread drains the queue and inserts the rows with bulk_create, so requests
+no longer wait on an INSERT per action or scan. Entries still queued when the
+process is killed are lost; with the setting disabled rows are written
+synchronously as before.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+
+from .models import Product, ProductActionLog, ScanHistory
+from .response_cache import PRODUCT_LOGS, SCAN_HISTORY, invalidate
+
+BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+# Cached listing that becomes stale when rows of each model are written;
+# bulk_create sends no post_save, so the writer invalidates these itself
+_LISTINGS = {
+    ProductActionLog: PRODUCT_LOGS,
+    ScanHistory: SCAN_HISTORY,
+}
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _enqueue(model, fields):
+    if not getattr(settings, 'ASYNC_LOG_WRITES', False):
+        model.objects.create(**fields)  # post_save invalidates the listing
+        return
+    transaction.on_commit(lambda: _queue.put((model, fields)))
+
+
+def enqueue_log(**fields):
+    """
+    Record a ProductActionLog entry.
+    Writes immediately unless ASYNC_LOG_WRITES is enabled, in which case the
+    entry is queued after the current transaction commits.
+    """
+    _enqueue(ProductActionLog, fields)
+
+
+def enqueue_scan(**fields):
+    """
+    Record a ScanHistory entry, following the same rules as enqueue_log.
+    scanned_at is auto_now_add, so queued scans are stamped when written.
+    """
+    _enqueue(ScanHistory, fields)
+
+
+def _drain(batch):
+    while len(batch) < BATCH_SIZE:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write_rows(model, objs):
+    # Fallback for a batch that failed as a whole: a product deleted before
+    # the flush breaks the FK, so keep the log with product nulled out the
+    # same way a synchronous delete would, and only drop rows that still fail
+    if model is ProductActionLog:
+        product_ids = {obj.product_id for obj in objs if obj.product_id is not None}
+        existing = set(Product.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+        for obj in objs:
+            if obj.product_id not in existing:
+                obj.product = None
+    for obj in objs:
+        try:
+            with transaction.atomic():
+                obj.save(force_insert=True)
+        except (DatabaseError, ValueError):
+            logger.exception("Dropping queued %s entry", model.__name__)
+
+
+def _write(batch):
+    rows = defaultdict(list)
+    for model, fields in batch:
+        rows[model].append(model(**fields))
+    # Each model is written on its own so a bad log row can't take the
+    # queued scans down with it
+    for model, objs in rows.items():
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        except IntegrityError:
+            _write_rows(model, objs)
+    invalidate(*(_LISTINGS[model] for model in rows))
+
+
+def flush():
+    """
+    Synchronously write every entry currently in the queue.
+    """
+    while batch := _drain([]):
+        _write(batch)
+
+
+def _run():
+    while True:
+        # Block until there is work, then pick up whatever else piled up
+        batch = _drain([_queue.get()])
+        close_old_connections()
+        try:
+            _write(batch)
+        except Exception:
+            logger.exception("Failed to write %d queued log entries", len(batch))
+        finally:
+            close_old_connections()
+
+
+def start_worker():
+    """
+    Start the background writer thread once per process.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            return
+        _worker = threading.Thread(target=_run, name='log-writer', daemon=True)
+        _worker.start()
+
+
+def _restart_after_fork():
+    # Threads don't survive fork (e.g. gunicorn --preload starts the app in
+    # the master), so give each child its own queue and writer thread
+    global _queue, _worker, _worker_lock
+    had_worker = _worker is not None
+    _queue = queue.Queue()
+    _worker = None
+    _worker_lock = threading.Lock()
+    if had_worker:
+        start_worker()
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_restart_after_fork)
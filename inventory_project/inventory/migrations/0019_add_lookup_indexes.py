@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-15 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0018_alter_product_expiry_date"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["name"], name="product_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="productactionlog",
+            index=models.Index(fields=["-timestamp"], name="actionlog_timestamp_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="scanhistory",
+            index=models.Index(fields=["-scanned_at"], name="scanhistory_scanned_at_idx"),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-15 07:10
+
+from django.db import migrations, models
+
+
+def parse_changes(apps, schema_editor):
+    ProductActionLog = apps.get_model("inventory", "ProductActionLog")
+    batch = []
+    for log in ProductActionLog.objects.only("quantity_change", "threshold_change").iterator():
+        log.quantity_delta = int(log.quantity_change) if log.quantity_change else None
+        log.threshold_delta = int(log.threshold_change) if log.threshold_change else None
+        batch.append(log)
+        if len(batch) >= 1000:
+            ProductActionLog.objects.bulk_update(batch, ["quantity_delta", "threshold_delta"])
+            batch = []
+    ProductActionLog.objects.bulk_update(batch, ["quantity_delta", "threshold_delta"])
+
+
+def _format(delta, zero):
+    if delta is None:
+        return None
+    return format(delta, "+d") if delta else zero
+
+
+def format_changes(apps, schema_editor):
+    ProductActionLog = apps.get_model("inventory", "ProductActionLog")
+    batch = []
+    for log in ProductActionLog.objects.only("action", "quantity_delta", "threshold_delta").iterator():
+        # Adds were always written as "+N" and a delete's quantity as "-N"
+        log.quantity_change = _format(log.quantity_delta, {"add": "+0", "delete": "-0"}.get(log.action, "0"))
+        log.threshold_change = _format(log.threshold_delta, "+0" if log.action == "add" else "0")
+        batch.append(log)
+        if len(batch) >= 1000:
+            ProductActionLog.objects.bulk_update(batch, ["quantity_change", "threshold_change"])
+            batch = []
+    ProductActionLog.objects.bulk_update(batch, ["quantity_change", "threshold_change"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0019_add_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productactionlog",
+            name="quantity_delta",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="productactionlog",
+            name="threshold_delta",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_changes, format_changes),
+        migrations.RemoveField(
+            model_name="productactionlog",
+            name="quantity_change",
+        ),
+        migrations.RemoveField(
+            model_name="productactionlog",
+            name="threshold_change",
+        ),
+        migrations.RenameField(
+            model_name="productactionlog",
+            old_name="quantity_delta",
+            new_name="quantity_change",
+        ),
+        migrations.RenameField(
+            model_name="productactionlog",
+            old_name="threshold_delta",
+            new_name="threshold_change",
+        ),
+    ]
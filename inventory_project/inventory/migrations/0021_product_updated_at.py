@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0020_productactionlog_integer_changes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
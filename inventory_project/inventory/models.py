@@ -1,7 +1,6 @@
 # inventory/models.py
 
 from django.db import models
-from django.utils import timezone
 
 
 class Product(models.Model):
@@ -16,6 +15,14 @@ class Product(models.Model):
     expiry_date = models.DateField()
     alert_threshold = models.PositiveIntegerField(default=10)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; list ETags use its latest value (queryset
+    # .update() calls must set it explicitly)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='product_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,6 +41,11 @@ class ScanHistory(models.Model):
     )
     scanned_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-scanned_at'], name='scanhistory_scanned_at_idx'),
+        ]
+
     def __str__(self):
         return self.barcode
 
@@ -61,9 +73,9 @@ class ProductActionLog(models.Model):
     action = models.CharField(max_length=10, choices=ACTION_CHOICES)
     source = models.CharField(max_length=20, default="manual")
 
-    # Change tracking
-    quantity_change = models.CharField(max_length=10, blank=True, null=True)
-    threshold_change = models.CharField(max_length=10, blank=True, null=True)
+    # Change tracking (signed differences; formatted by format_change for display)
+    quantity_change = models.IntegerField(blank=True, null=True)
+    threshold_change = models.IntegerField(blank=True, null=True)
 
     # Current state of product
     current_quantity = models.PositiveIntegerField(null=True, blank=True)
@@ -71,5 +83,31 @@ class ProductActionLog(models.Model):
 
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp'], name='actionlog_timestamp_idx'),
+        ]
+
     def __str__(self):
         return f"{self.action.title()} - {self.product_name} ({self.source})"
+
+
+# Zero changes keep the sign they were written with before these fields
+# became integers: adds always showed "+", a delete's quantity always "-"
+_ZERO_SIGNS = {
+    ('add', 'quantity'): '+',
+    ('add', 'threshold'): '+',
+    ('delete', 'quantity'): '-',
+}
+
+
+def format_change(value, action, field):
+    """
+    Format a stored quantity or threshold change as "+N", "-N" or "0".
+    `field` is 'quantity' or 'threshold'; None stays None.
+    """
+    if value is None:
+        return None
+    if value:
+        return format(value, '+d')
+    return _ZERO_SIGNS.get((action, field), '') + '0'
@@ -0,0 +1,101 @@
+# inventory/response_cache.py
+
+"""
+Versioned, streamed JSON responses for read-only list endpoints.
+
+Each listing is cached as a rendered JSON body under "<name>:v<version>".
+Writers call invalidate() to bump the version, which makes every older
+entry unreachable without having to find and delete it. On a miss the
+rows are streamed to the client as they are read and the finished body is
+cached for the next request. Caching is skipped unless the cache backend
+is shared between workers, since invalidate() could not reach the others.
+
+Each cached body is stored with the ETag it was served under, so the
+ETag always names the exact bytes a client received; ConditionalGetMiddleware
+answers If-None-Match against it without touching the database.
+"""
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+TIMEOUT = 300
+
+# Rows are encoded and sent to the client in blocks of this size
+STREAM_CHUNK_SIZE = 2000
+
+PRODUCT_LOGS = 'product_logs'
+SCAN_HISTORY = 'scan_history'
+
+# Same encoding options DRF's JSONRenderer uses for API responses
+_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def enabled():
+    """
+    Whether listings are cached; only with a backend shared by all workers.
+    """
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', False)
+
+
+def _version_key(name):
+    return f"{name}:ver"
+
+
+def _encode(rows):
+    started = False
+    block = []
+    for row in rows:
+        block.append(_encoder.encode(row))
+        if len(block) >= STREAM_CHUNK_SIZE:
+            yield ((',' if started else '[') + ','.join(block)).encode()
+            started = True
+            block = []
+    yield ((',' if started else '[') + ','.join(block) + ']').encode()
+
+
+def _stream(key, etag, rows):
+    chunks = []
+    for chunk in _encode(rows):
+        chunks.append(chunk)
+        yield chunk
+    cache.set(key, (etag, b''.join(chunks)), TIMEOUT)
+
+
+def get_or_stream(name, rows):
+    """
+    Return the cached JSON body for `name`, or stream the dicts produced by
+    `rows()` as a JSON array and cache the result once it is complete.
+    Either way the response carries the ETag stored with that body.
+    Without a shared cache backend (RESPONSE_CACHE_ENABLED) the rows are
+    streamed uncached on every call and the view supplies the ETag.
+    """
+    if not enabled():
+        return StreamingHttpResponse(_encode(rows()), content_type='application/json')
+    key = f"{name}:v{cache.get(_version_key(name), 0)}"
+    entry = cache.get(key)
+    if entry is not None:
+        etag, body = entry
+        response = HttpResponse(body, content_type='application/json')
+    else:
+        etag = f'"{uuid4().hex}"'
+        response = StreamingHttpResponse(_stream(key, etag, rows()), content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+
+def invalidate(*names):
+    """
+    Bump the version of each named listing so the next read rebuilds it.
+    Does nothing while the response cache is disabled.
+    """
+    if not enabled():
+        return
+    for name in names:
+        try:
+            cache.incr(_version_key(name))
+        except ValueError:
+            cache.set(_version_key(name), 1, None)
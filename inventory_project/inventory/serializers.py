@@ -1,5 +1,6 @@
 # inventory/serializers.py
 
+from django.db import models
 from rest_framework import serializers
 from .models import Product, ScanHistory
 
@@ -14,6 +15,36 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+# Field names ProductSerializer emits for '__all__', resolved once at import
+PRODUCT_FIELDS = tuple(field.attname for field in Product._meta.concrete_fields)
+
+
+def serialize_product(product):
+    """
+    Read-only fast path equivalent to ProductSerializer(product).data.
+    Skips DRF's per-instance field setup; dates and datetimes are left for
+    the JSON renderer to format.
+    """
+    return {name: getattr(product, name) for name in PRODUCT_FIELDS}
+
+
+class ScanHistoryListSerializer(serializers.ListSerializer):
+    """
+    List serializer for ScanHistory.
+    Loads the products for every scanned barcode in one query and shares
+    them with the child serializer through the context.
+    """
+    def to_representation(self, data):
+        scans = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        barcodes = {scan.barcode for scan in scans}
+        self.context['product_map'] = (
+            Product.objects.filter(barcode__in=barcodes)
+            .only('name', 'sku', 'barcode')
+            .in_bulk(field_name='barcode')
+        )
+        return super().to_representation(scans)
+
+
 class ScanHistorySerializer(serializers.ModelSerializer):
     """
     Serializer for ScanHistory.
@@ -24,13 +55,18 @@ class ScanHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ScanHistory
         fields = ['barcode', 'scanned_at', 'product']
+        list_serializer_class = ScanHistoryListSerializer
 
     def get_product(self, obj):
         """
         Return basic product details linked to the scanned barcode.
         If the barcode doesn't match any product, returns 'Unknown'.
         """
-        product = Product.objects.filter(barcode=obj.barcode).only('name', 'sku').first()
+        product_map = self.context.get('product_map')
+        if product_map is not None:
+            product = product_map.get(obj.barcode)
+        else:
+            product = Product.objects.filter(barcode=obj.barcode).only('name', 'sku').first()
         return {
             'name': product.name if product else 'Unknown',
             'sku': product.sku if product else 'Unknown',
@@ -0,0 +1,44 @@
+# inventory/signals.py
+
+"""
+Keep cached listings in step with the rows they show.
+
+Any save or delete through the ORM (API views, the admin, shell scripts)
+bumps the affected listing versions once the transaction commits. Product
+changes also stale the scan and log listings, which embed product details.
+bulk_create and queryset .update() send no signals; log_writer invalidates
+after its bulk inserts itself, and anything else is picked up when the
+cached entry expires.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Product, ProductActionLog, ScanHistory
+from .response_cache import PRODUCT_LOGS, SCAN_HISTORY, enabled, invalidate
+
+_LISTINGS = {
+    Product: (PRODUCT_LOGS, SCAN_HISTORY),
+    ProductActionLog: (PRODUCT_LOGS,),
+    ScanHistory: (SCAN_HISTORY,),
+}
+
+
+def _invalidate_listings(sender, **kwargs):
+    if not enabled():
+        return  # nothing is cached, so don't queue work on every write
+    names = _LISTINGS[sender]
+    transaction.on_commit(lambda: invalidate(*names))
+
+
+def connect():
+    """
+    Register the invalidation handlers; called from InventoryConfig.ready().
+    """
+    for model in _LISTINGS:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _invalidate_listings,
+                sender=model,
+                dispatch_uid=f'invalidate-{model._meta.label_lower}-{signal is post_save}',
+            )
@@ -2,20 +2,37 @@
 
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
+from django.core.cache import cache
+from django.conf import settings
+from django.test import override_settings
+from . import log_writer
 from .models import Product, ProductActionLog, ScanHistory
+from .serializers import ProductSerializer, serialize_product
+from rest_framework.renderers import JSONRenderer
 from datetime import datetime, timedelta
 from django.utils import timezone
+import json
+
+
+def read_json(response):
+    """
+    Decode a JSON body from either a streamed or a regular response.
+    """
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return json.loads(body)
 
 
 class InventoryTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.product = Product.objects.create(
             name="Widget",
             sku="WID123",
             barcode="999888777666",
             quantity=50,
-            alert_threshold=5
+            alert_threshold=5,
+            expiry_date="2030-01-01"
         )
 
     def test_barcode_lookup_returns_similar_if_exact_missing(self):
@@ -24,7 +41,8 @@ class InventoryTests(APITestCase):
             sku="WIDVAR",
             barcode="999888000000",
             quantity=20,
-            alert_threshold=4
+            alert_threshold=4,
+            expiry_date="2030-01-01"
         )
         Product.objects.filter(barcode=self.product.barcode).delete()
 
@@ -34,6 +52,23 @@ class InventoryTests(APITestCase):
         self.assertIn('similar', response.data)
         self.assertEqual(response.data['similar'][0]['sku'], similar.sku)
 
+    def test_barcode_lookup_finds_exact_among_many_similar(self):
+        for i in range(6):
+            Product.objects.create(
+                name=f"Widget {i}",
+                sku=f"WID-SIM-{i}",
+                barcode=f"99988800000{i}",
+                quantity=1,
+                alert_threshold=1,
+                expiry_date="2030-01-01"
+            )
+
+        url = reverse('product-by-barcode', args=[self.product.barcode])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['exact']['sku'], self.product.sku)
+        self.assertNotIn('similar', response.data)
+
     def test_scan_history_auto_logs_correct_source(self):
         url = reverse('product-by-barcode', args=[self.product.barcode])
         response = self.client.get(url + "?source=scan-from-add")
@@ -48,14 +83,15 @@ class InventoryTests(APITestCase):
             "sku": self.product.sku,
             "barcode": self.product.barcode,
             "quantity": self.product.quantity,
-            "alert_threshold": self.product.alert_threshold
+            "alert_threshold": self.product.alert_threshold,
+            "expiry_date": self.product.expiry_date
         }
         response = self.client.put(url + "?source=manual", data, format='json')
         self.assertEqual(response.status_code, 200)
 
         log = ProductActionLog.objects.last()
-        self.assertEqual(log.quantity_change, "0")
-        self.assertEqual(log.threshold_change, "0")
+        self.assertEqual(log.quantity_change, 0)
+        self.assertEqual(log.threshold_change, 0)
 
     def test_delete_nulls_product_reference_in_log(self):
         url = reverse('product-detail', args=[self.product.id])
@@ -88,8 +124,8 @@ class InventoryTests(APITestCase):
             product_sku=self.product.sku,
             action='edit',
             source='manual',
-            quantity_change="+1",
-            threshold_change="+1",
+            quantity_change=1,
+            threshold_change=1,
             current_quantity=51,
             current_threshold=6,
             timestamp=timezone.now() - timedelta(days=1)
@@ -101,8 +137,8 @@ class InventoryTests(APITestCase):
             product_sku=self.product.sku,
             action='edit',
             source='manual',
-            quantity_change="+2",
-            threshold_change="+2",
+            quantity_change=2,
+            threshold_change=2,
             current_quantity=53,
             current_threshold=8,
             timestamp=timezone.now()
@@ -110,14 +146,16 @@ class InventoryTests(APITestCase):
 
         url = reverse('product-logs')
         response = self.client.get(url)
-        timestamps = [entry['timestamp'] for entry in response.data]
+        timestamps = [entry['timestamp'] for entry in read_json(response)]
         self.assertGreaterEqual(timestamps[0], timestamps[1])  # Latest first
 
     def test_scan_today_filters_correctly(self):
-        # Insert one from yesterday
-        ScanHistory.objects.create(
+        # Insert one from yesterday (scanned_at is auto_now_add, so backdate it)
+        yesterday = ScanHistory.objects.create(
             barcode='000011112222',
-            source='scanner',
+            source='scanner'
+        )
+        ScanHistory.objects.filter(pk=yesterday.pk).update(
             scanned_at=timezone.now() - timedelta(days=1)
         )
         # Insert one from today
@@ -131,3 +169,304 @@ class InventoryTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['barcode'], '000011113333')
+
+    @override_settings(ASYNC_LOG_WRITES=True)
+    def test_async_log_writes_are_flushed_after_commit(self):
+        url = reverse('product-detail', args=[self.product.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+
+        self.assertFalse(ProductActionLog.objects.exists())  # still queued
+        log_writer.flush()
+
+        log = ProductActionLog.objects.get()
+        self.assertEqual(log.action, 'delete')
+        self.assertEqual(log.product_sku, "WID123")
+
+    @override_settings(ASYNC_LOG_WRITES=True)
+    def test_async_scan_writes_are_flushed_after_commit(self):
+        url = reverse('product-by-barcode', args=[self.product.barcode])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(url + "?source=scan-from-add")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(ScanHistory.objects.exists())  # still queued
+        log_writer.flush()
+
+        scan = ScanHistory.objects.get()
+        self.assertEqual(scan.barcode, self.product.barcode)
+        self.assertEqual(scan.source, 'scan-from-add')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_scan_history_cache_refreshes_after_scan(self):
+        url = reverse('scan-history')
+        self.assertEqual(read_json(self.client.get(url)), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('product-by-barcode', args=[self.product.barcode]))
+
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        data = read_json(response)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['product']['sku'], self.product.sku)
+
+        cached = self.client.get(url)
+        self.assertFalse(cached.streaming)
+        self.assertEqual(read_json(cached), data)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_product_logs_conditional_get_returns_not_modified(self):
+        url = reverse('product-logs')
+        response = self.client.get(url)
+        etag = response['ETag']
+        read_json(response)  # the body is cached once the stream is consumed
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('product-detail', args=[self.product.id]))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_scan_history_is_not_cached_without_shared_cache(self):
+        url = reverse('scan-history')
+        self.assertEqual(read_json(self.client.get(url)), [])
+
+        # Without a shared backend invalidate() can't reach other workers,
+        # so each request reads the database instead of a local copy
+        ScanHistory.objects.create(barcode=self.product.barcode, source='scanner')
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(read_json(response)), 1)
+
+    def test_writes_skip_invalidation_without_shared_cache(self):
+        url = reverse('product-by-barcode', args=[self.product.barcode])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.get(url)
+        self.assertEqual(callbacks, [])
+        self.assertTrue(ScanHistory.objects.exists())
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_product_save_outside_api_invalidates_scan_history(self):
+        ScanHistory.objects.create(barcode=self.product.barcode, source='scanner')
+        url = reverse('scan-history')
+        self.assertEqual(read_json(self.client.get(url))[0]['product']['name'], "Widget")
+
+        # e.g. an admin edit, which never goes through the API views
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Renamed"
+            self.product.save()
+
+        self.assertEqual(read_json(self.client.get(url))[0]['product']['name'], "Renamed")
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_product_logs_etag_follows_rebuilt_body(self):
+        url = reverse('product-logs')
+        response = self.client.get(url)
+        etag = response['ETag']
+        read_json(response)
+
+        # A write that skipped invalidate() shows up once the entry expires,
+        # and the client's old ETag no longer matches the rebuilt body
+        ProductActionLog.objects.create(
+            product_name=self.product.name,
+            product_sku=self.product.sku,
+            action='edit',
+            quantity_change=1,
+            threshold_change=0
+        )
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(read_json(response)), 1)
+
+    def test_products_conditional_get_skips_list_query(self):
+        url = reverse('product-list-create')
+        etag = self.client.get(url)['ETag']
+
+        # Only the ETag aggregate runs; the product list is never built
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # e.g. an admin edit, which writes no ProductActionLog
+        self.product.name = "Renamed"
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(read_json(response)[0]['name'], "Renamed")
+
+    def test_listings_conditional_get_without_response_cache(self):
+        ScanHistory.objects.create(barcode=self.product.barcode, source='scanner')
+        ProductActionLog.objects.create(
+            product=self.product,
+            product_name=self.product.name,
+            product_sku=self.product.sku,
+            action='add',
+            quantity_change=50,
+            threshold_change=5
+        )
+        etags = {}
+        for name in ('scan-history', 'scan-history-today', 'product-logs'):
+            url = reverse(name)
+            response = self.client.get(url)
+            self.assertEqual(len(read_json(response)), 1)
+            etags[name] = response['ETag']
+
+            # One aggregate for the listing's table and one for products
+            with self.assertNumQueries(2):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[name])
+            self.assertEqual(response.status_code, 304, name)
+
+        # Every listing embeds product details, so a product edit changes them all
+        self.product.expiry_date = "2031-01-01"
+        self.product.save()
+        for name, etag in etags.items():
+            response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, name)
+
+    def test_logs_format_changes_with_sign(self):
+        url = reverse('product-detail', args=[self.product.id])
+        self.client.delete(url)
+
+        entry = read_json(self.client.get(reverse('product-logs')))[0]
+        self.assertEqual(entry['quantity_change'], "-50")
+        self.assertEqual(entry['threshold_change'], "0")
+
+    def test_logs_format_add_and_edit_changes(self):
+        data = {
+            "name": "Empty Bin",
+            "sku": "BIN001",
+            "barcode": "123123123123",
+            "quantity": 0,
+            "alert_threshold": 2,
+            "expiry_date": "2030-01-01"
+        }
+        response = self.client.post(reverse('product-list-create'), data, format='json')
+        url = reverse('product-detail', args=[response.data['id']])
+        self.client.put(url, dict(data, quantity=3), format='json')
+        self.client.put(url, dict(data, quantity=3), format='json')
+
+        logs = read_json(self.client.get(reverse('product-logs')))
+        changes = [(log['action'], log['quantity_change'], log['threshold_change']) for log in logs]
+        self.assertEqual(changes, [
+            ('edit', "0", "0"),
+            ('edit', "+3", "0"),
+            ('add', "+0", "+2"),
+        ])
+
+    def test_logs_format_delete_of_empty_product(self):
+        Product.objects.filter(pk=self.product.pk).update(quantity=0)
+        self.client.delete(reverse('product-detail', args=[self.product.id]))
+
+        entry = read_json(self.client.get(reverse('product-logs')))[0]
+        self.assertEqual(entry['quantity_change'], "-0")
+        self.assertEqual(entry['threshold_change'], "0")
+
+    def test_product_logs_query_count_is_constant(self):
+        for i in range(5):
+            ProductActionLog.objects.create(
+                product=self.product,
+                product_name=self.product.name,
+                product_sku=self.product.sku,
+                action='edit',
+                quantity_change=i,
+                threshold_change=0
+            )
+
+        # Two ETag aggregates plus one joined SELECT, regardless of row count
+        with self.assertNumQueries(3):
+            data = read_json(self.client.get(reverse('product-logs')))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['product']['expiry_date'], "2030-01-01")
+
+    def test_scan_history_query_count_is_constant(self):
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Item {i}",
+                sku=f"ITEM{i}",
+                barcode=f"55500000000{i}",
+                quantity=1,
+                expiry_date="2030-01-01"
+            )
+            ScanHistory.objects.create(barcode=product.barcode, source='scanner')
+        ScanHistory.objects.create(barcode='000000000000', source='scanner')  # unknown
+
+        # Two ETag aggregates, the scans, and one product lookup for the lot
+        with self.assertNumQueries(4):
+            data = read_json(self.client.get(reverse('scan-history')))
+        self.assertEqual(len(data), 4)
+        skus = {entry['product']['sku'] for entry in data if entry['product']}
+        self.assertEqual(skus, {"ITEM0", "ITEM1", "ITEM2"})
+
+    def test_scan_today_query_count_is_constant(self):
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Item {i}",
+                sku=f"ITEM{i}",
+                barcode=f"55500000000{i}",
+                quantity=1,
+                expiry_date="2030-01-01"
+            )
+            ScanHistory.objects.create(barcode=product.barcode, source='scanner')
+        ScanHistory.objects.create(barcode='000000000000', source='scanner')  # unknown
+
+        # Two ETag aggregates, the scans, and one product lookup for the lot
+        with self.assertNumQueries(4):
+            data = read_json(self.client.get(reverse('scan-history-today')))
+        self.assertEqual(len(data), 4)
+        names = {entry['product']['name'] for entry in data}
+        self.assertEqual(names, {"Item 0", "Item 1", "Item 2", "Unknown"})
+
+    def test_serialize_product_matches_model_serializer(self):
+        self.product.refresh_from_db()
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(serialize_product(self.product)),
+            renderer.render(ProductSerializer(self.product).data)
+        )
+
+    def test_home_supports_conditional_get(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(read_json(response)['status'], "OK")
+
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_home_lists_admin_only_when_enabled(self):
+        endpoints = read_json(self.client.get('/'))['endpoints']
+        self.assertEqual('admin' in endpoints, settings.ENABLE_ADMIN)
+
+
+class LogWriterTests(APITransactionTestCase):
+    # Foreign keys are only checked on commit, so these need real transactions
+
+    def test_flush_keeps_logs_for_products_deleted_before_write(self):
+        product = Product.objects.create(
+            name="Gadget",
+            sku="GAD123",
+            barcode="111222333444",
+            quantity=5,
+            alert_threshold=1,
+            expiry_date="2030-01-01"
+        )
+        log_writer._queue.put((ProductActionLog, {
+            'product': product,
+            'product_name': product.name,
+            'product_sku': product.sku,
+            'action': 'edit',
+            'quantity_change': 1,
+            'threshold_change': 0
+        }))
+        log_writer._queue.put((ScanHistory, {'barcode': product.barcode, 'source': 'scanner'}))
+        Product.objects.filter(pk=product.pk).delete()
+
+        log_writer.flush()
+
+        log = ProductActionLog.objects.get()
+        self.assertIsNone(log.product_id)
+        self.assertEqual(log.product_sku, "GAD123")
+        self.assertTrue(ScanHistory.objects.exists())
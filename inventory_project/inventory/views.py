@@ -5,26 +5,100 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
+from django.db.models import Case, Count, Max, When
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from django.utils import timezone
 from django.utils.timezone import localdate
-from .models import Product, ScanHistory, ProductActionLog
-from .serializers import ProductSerializer, ScanHistorySerializer
-from django.http import JsonResponse
+from datetime import datetime, time, timedelta
+from itertools import islice
+from .models import Product, ScanHistory, ProductActionLog, format_change
+from .serializers import ProductSerializer, ScanHistorySerializer, serialize_product
+from .log_writer import enqueue_log, enqueue_scan
+from . import response_cache
+from .response_cache import PRODUCT_LOGS, SCAN_HISTORY, STREAM_CHUNK_SIZE, get_or_stream
+from django.conf import settings
+from django.http import HttpResponse
+import json
 
 
 
+def _today_range():
+    today = localdate()
+    start = timezone.make_aware(datetime.combine(today, time.min))
+    end = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
+    return start, end
+
+
+def _etag_for(*sources):
+    """
+    Build an ETag from the row count and latest value of `field` for each
+    (queryset, field) pair. One aggregate per source stands in for running
+    the full query when the client already has the current data.
+    """
+    parts = []
+    for queryset, field in sources:
+        stats = queryset.aggregate(latest=Max(field), count=Count('pk'))
+        latest = stats['latest'].isoformat() if stats['latest'] else ''
+        parts.append(f"{latest}-{stats['count']}")
+    return '"' + ':'.join(parts) + '"'
+
+
+# Every listing embeds product details, so each ETag also covers the
+# products table through updated_at (and its row count, for deletes)
+_PRODUCTS = (Product.objects.all(), 'updated_at')
+
+
+def _products_etag(request):
+    if request.method != 'GET':
+        return None
+    return _etag_for(_PRODUCTS)
+
+
+def _scan_today_etag(request):
+    start, end = _today_range()
+    scans = ScanHistory.objects.filter(scanned_at__gte=start, scanned_at__lt=end)
+    return _etag_for((scans, 'scanned_at'), _PRODUCTS)
+
+
+# With the response cache on, get_or_stream sends the ETag stored with the
+# cached body instead, so these only run against the database without it
+
+def _scan_history_etag(request):
+    if response_cache.enabled():
+        return None
+    return _etag_for((ScanHistory.objects.all(), 'scanned_at'), _PRODUCTS)
+
+
+def _product_logs_etag(request):
+    if response_cache.enabled():
+        return None
+    return _etag_for((ProductActionLog.objects.all(), 'timestamp'), _PRODUCTS)
+
+
+_ENDPOINTS = {
+    "products": "/api/products/",
+    "scan_history": "/api/history/",
+    "product_logs": "/api/logs/",
+}
+if settings.ENABLE_ADMIN:
+    _ENDPOINTS["admin"] = "/admin/"
+
+# The landing payload never changes, so it is encoded once at import
+_HOME_BODY = json.dumps({
+    "message": "Welcome to the Inventory Management API",
+    "endpoints": _ENDPOINTS,
+    "status": "OK"
+}).encode()
+
+
 def home(request):
-    return JsonResponse({
-        "message": "Welcome to the Inventory Management API",
-        "endpoints": {
-            "products": "/api/products/",
-            "scan_history": "/api/history/",
-            "product_logs": "/api/logs/",
-            "admin": "/admin/"
-        },
-        "status": "OK"
-    })
+    return HttpResponse(_HOME_BODY, content_type='application/json')
 
 @csrf_exempt
+@vary_on_headers('Authorization')
+@condition(etag_func=_products_etag)
 @api_view(['GET', 'POST'])
 def products(request):
     """
@@ -32,22 +106,23 @@ def products(request):
     POST: Add a new product (logs 'add' in ProductActionLog).
     """
     if request.method == 'GET':
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        products = Product.objects.values(
+            'id', 'name', 'sku', 'barcode', 'quantity', 'alert_threshold', 'expiry_date'
+        )
+        return Response(list(products))
 
     elif request.method == 'POST':
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
             product = serializer.save()
-            ProductActionLog.objects.create(
+            enqueue_log(
                 product=product,
                 product_name=product.name,
                 product_sku=product.sku,
                 action='add',
                 source=request.GET.get('source', 'manual'),
-                quantity_change=f"+{product.quantity}",
-                threshold_change=f"+{product.alert_threshold}",
+                quantity_change=product.quantity,
+                threshold_change=product.alert_threshold,
                 current_quantity=product.quantity,
                 current_threshold=product.alert_threshold
             )
@@ -64,8 +139,7 @@ def product_detail(request, pk):
     product = get_object_or_404(Product, pk=pk)
 
     if request.method == 'GET':
-        serializer = ProductSerializer(product)
-        return Response(serializer.data)
+        return Response(serialize_product(product))
 
     elif request.method == 'PUT':
         old_quantity = product.quantity
@@ -80,14 +154,14 @@ def product_detail(request, pk):
             quantity_diff = new_quantity - old_quantity
             threshold_diff = new_threshold - old_threshold
 
-            ProductActionLog.objects.create(
+            enqueue_log(
                 product=product,
                 product_name=product.name,
                 product_sku=product.sku,
                 action='edit',
                 source=request.GET.get('source', 'manual'),
-                quantity_change=f"{'+' if quantity_diff >= 0 else ''}{quantity_diff}" if quantity_diff != 0 else "0",
-                threshold_change=f"{'+' if threshold_diff >= 0 else ''}{threshold_diff}" if threshold_diff != 0 else "0",
+                quantity_change=quantity_diff,
+                threshold_change=threshold_diff,
                 current_quantity=new_quantity,
                 current_threshold=new_threshold
             )
@@ -96,14 +170,14 @@ def product_detail(request, pk):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        ProductActionLog.objects.create(
+        enqueue_log(
             product=None,  # FK is null since product will be deleted
             product_name=product.name,
             product_sku=product.sku,
             action='delete',
             source=request.GET.get('source', 'manual'),
-            quantity_change=f"-{abs(product.quantity)}",
-            threshold_change="0",
+            quantity_change=-product.quantity,
+            threshold_change=0,
             current_quantity=0,
             current_threshold=product.alert_threshold
         )
@@ -111,6 +185,7 @@ def product_detail(request, pk):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@never_cache  # every lookup must reach the view so the scan gets logged
 @api_view(['GET'])
 def product_by_barcode(request, barcode):
     """
@@ -119,16 +194,23 @@ def product_by_barcode(request, barcode):
     Returns exact match if found, and similar barcodes if not.
     """
     source = request.GET.get('source', 'scanner')
-    ScanHistory.objects.create(barcode=barcode, source=source)
+    enqueue_scan(barcode=barcode, source=source)
 
-    exact_product = Product.objects.filter(barcode=barcode).first()
-    similar_products = Product.objects.filter(barcode__startswith=barcode[:6])[:5] if not exact_product else []
+    # One prefix query covers both cases; the exact match (if any) sorts first.
+    # On PostgreSQL the LIKE 'prefix%' scan uses the varchar_pattern_ops
+    # "_like" index Django creates alongside barcode's unique index.
+    candidates = list(
+        Product.objects.filter(barcode__startswith=barcode[:6])
+        .order_by(Case(When(barcode=barcode, then=0), default=1), 'barcode')[:5]
+    )
+    exact_product = candidates[0] if candidates and candidates[0].barcode == barcode else None
+    similar_products = candidates if not exact_product else []
 
     response = {}
     if exact_product:
-        response['exact'] = ProductSerializer(exact_product).data
+        response['exact'] = serialize_product(exact_product)
     if similar_products:
-        response['similar'] = ProductSerializer(similar_products, many=True).data
+        response['similar'] = [serialize_product(product) for product in similar_products]
 
     if not response:
         return Response({'detail': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -137,60 +219,102 @@ def product_by_barcode(request, barcode):
 
 
 
+def _iter_scan_history():
+    history = (
+        ScanHistory.objects.order_by('-scanned_at')
+        .values('barcode', 'scanned_at')
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+    # Resolve products one chunk of scans at a time instead of one per scan
+    for chunk in iter(lambda: list(islice(history, STREAM_CHUNK_SIZE)), []):
+        barcodes = {entry['barcode'] for entry in chunk}
+        product_map = {
+            product.barcode: product
+            for product in Product.objects.filter(barcode__in=barcodes).only('id', 'name', 'sku', 'barcode')
+        }
+        for entry in chunk:
+            product = product_map.get(entry['barcode'])
+            yield {
+                'barcode': entry['barcode'],
+                'scanned_at': entry['scanned_at'],
+                'product': {
+                    'name': product.name,
+                    'sku': product.sku,
+                    'id': product.id,
+                } if product else None
+            }
+
+
+@vary_on_headers('Authorization')
+@condition(etag_func=_scan_history_etag)
 @api_view(['GET'])
 def scan_history(request):
     """
     GET: Returns all scan records, including related product info if available.
+    Streamed from the database, then served from cache until a scan or
+    product change invalidates it.
     """
-    history = ScanHistory.objects.all().order_by('-scanned_at')
-    data = []
-
-    for entry in history:
-        product = Product.objects.filter(barcode=entry.barcode).first()
-        data.append({
-            'barcode': entry.barcode,
-            'scanned_at': entry.scanned_at,
-            'product': {
-                'name': product.name if product else None,
-                'sku': product.sku if product else None,
-                'id': product.id if product else None,
-            } if product else None
-        })
-
-    return Response(data)
+    return get_or_stream(SCAN_HISTORY, _iter_scan_history)
 
+@vary_on_headers('Authorization')
+@condition(etag_func=_scan_today_etag)
 @api_view(['GET'])
 def scan_today(request):
-    today = localdate()
-    scans = ScanHistory.objects.filter(scanned_at__date=today).order_by('-scanned_at')
+    """
+    GET: Returns scans recorded since local midnight.
+    Filters on a timestamp range so the scanned_at index can be used.
+    """
+    start, end = _today_range()
+    scans = ScanHistory.objects.filter(scanned_at__gte=start, scanned_at__lt=end).order_by('-scanned_at')
     serializer = ScanHistorySerializer(scans, many=True)
     return Response(serializer.data)
 
 
+def _iter_product_logs():
+    # Plain rows skip model instantiation; product__expiry_date joins in the
+    # product instead of fetching it separately for every log
+    logs = ProductActionLog.objects.order_by('-timestamp').values(
+        'product_name',
+        'product_sku',
+        'product_id',
+        'product__expiry_date',
+        'action',
+        'source',
+        'quantity_change',
+        'current_quantity',
+        'threshold_change',
+        'current_threshold',
+        'timestamp'
+    ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    return (
+        {
+            'product': {
+                'name': log['product_name'],
+                'sku': log['product_sku'],
+                'id': log['product_id'],
+                'expiry_date': log['product__expiry_date'].isoformat() if log['product__expiry_date'] else None
+            },
+            'action': log['action'],
+            'source': log['source'],
+            'quantity_change': format_change(log['quantity_change'], log['action'], 'quantity'),
+            'current_quantity': log['current_quantity'],
+            'threshold_change': format_change(log['threshold_change'], log['action'], 'threshold'),
+            'current_threshold': log['current_threshold'],
+            'timestamp': log['timestamp']
+        }
+        for log in logs
+    )
+
+
+@vary_on_headers('Authorization')
+@condition(etag_func=_product_logs_etag)
 @api_view(['GET'])
 def product_logs(request):
     """
     GET: Returns the product action logs (add/edit/delete) from ProductActionLog.
     Each log includes product name, SKU, expiry date, changes, and timestamp.
+    Streamed from the database, then served from cache until a product
+    change invalidates it.
     """
-    logs = ProductActionLog.objects.order_by('-timestamp')
-    data = [
-        {
-            'product': {
-                'name': log.product_name,
-                'sku': log.product_sku,
-                'id': log.product.id if log.product else None,
-                'expiry_date': log.product.expiry_date.isoformat() if log.product and log.product.expiry_date else None
-            },
-            'action': log.action,
-            'source': log.source,
-            'quantity_change': log.quantity_change,
-            'current_quantity': log.current_quantity,
-            'threshold_change': log.threshold_change,
-            'current_threshold': log.current_threshold,
-            'timestamp': log.timestamp
-        }
-        for log in logs
-    ]
-    return Response(data)
+    return get_or_stream(PRODUCT_LOGS, _iter_product_logs)
 
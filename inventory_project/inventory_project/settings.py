@@ -1,67 +1,141 @@
 from pathlib import Path
-from dotenv import load_dotenv
 import dj_database_url
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (local development only; in
+# production the platform provides them, so skip the import and file search)
+if os.getenv("DJANGO_ENV", "dev") != "prod" and not os.getenv("SKIP_DOTENV"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _csv(name, default=""):
+    """Parse a comma-separated env var into a tuple, dropping empty entries."""
+    return tuple(item.strip() for item in os.getenv(name, default).split(",") if item.strip())
+
 
 # Base directory of the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Debug mode toggle (should be False in production)
 DEBUG = os.getenv("DEBUG", "False") == "True"
+PROD = not DEBUG
 
 # Secret key used by Django for cryptographic signing
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # Hosts/domain names allowed to serve the application
-ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
+ALLOWED_HOSTS = _csv("ALLOWED_HOSTS")
 
 # ---------------- CORS & CSRF Settings ----------------
 
+# CORS is only needed when the frontend is served from another domain;
+# same-origin deployments can set ENABLE_CORS=False to skip it entirely
+ENABLE_CORS = os.getenv("ENABLE_CORS", "True") == "True"
+
 # Allow cookies and credentials to be included in cross-site HTTP requests
 CORS_ALLOW_CREDENTIALS = True
 
 # List of frontend domains allowed to make requests (comma-separated in .env)
-CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+CORS_ALLOWED_ORIGINS = _csv("CORS_ALLOWED_ORIGINS")
 
 # Trusted origins for CSRF protection (used when frontend and backend are on different domains)
-CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+CSRF_TRUSTED_ORIGINS = _csv("CSRF_TRUSTED_ORIGINS")
 
 # ---------------- Installed Apps ----------------
 
+# API-only workers can set ENABLE_ADMIN=False to skip loading the admin.
+# The admin needs the messages framework, so messages can only be turned
+# off (ENABLE_MESSAGES=False) when the admin is off too
+ENABLE_ADMIN = os.getenv("ENABLE_ADMIN", "True") == "True"
+ENABLE_MESSAGES = ENABLE_ADMIN or os.getenv("ENABLE_MESSAGES", "True") == "True"
+
 INSTALLED_APPS = [
-    'corsheaders',                       # Enables Cross-Origin Resource Sharing
     'rest_framework',                    # Django REST Framework for APIs
     'inventory',                         # Custom app for inventory logic
-    "django.contrib.admin",              # Django admin interface
     "django.contrib.auth",               # Authentication framework
     "django.contrib.contenttypes",       # Content type system
     "django.contrib.sessions",           # Session framework
-    "django.contrib.messages",           # Messaging framework
     "django.contrib.staticfiles",        # Manages static files
 ]
 
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index('inventory') + 1, "django.contrib.admin")  # Django admin interface
+if ENABLE_MESSAGES:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("django.contrib.staticfiles"), "django.contrib.messages")  # Messaging framework
+
 # ---------------- Middleware Stack ----------------
 
 MIDDLEWARE = [
-    "corsheaders.middleware.CorsMiddleware",         # Handle CORS headers
     "django.middleware.security.SecurityMiddleware", # Security enhancements
+    "whitenoise.middleware.WhiteNoiseMiddleware",    # Serve static files (must follow SecurityMiddleware)
+    "django.middleware.gzip.GZipMiddleware",         # Compress responses for clients that accept gzip
     "django.contrib.sessions.middleware.SessionMiddleware", # Session handling
     "django.middleware.common.CommonMiddleware",     # Basic middleware for common operations
+    "django.middleware.http.ConditionalGetMiddleware", # ETag / 304 Not Modified handling
     "django.middleware.csrf.CsrfViewMiddleware",     # CSRF protection
     "django.contrib.auth.middleware.AuthenticationMiddleware", # Authentication management
-    "django.contrib.messages.middleware.MessageMiddleware",     # Temporary message framework
     "django.middleware.clickjacking.XFrameOptionsMiddleware",   # Prevent clickjacking
 ]
 
+if ENABLE_MESSAGES:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.clickjacking.XFrameOptionsMiddleware"),
+        "django.contrib.messages.middleware.MessageMiddleware",     # Temporary message framework
+    )
+
+# CorsMiddleware goes after Security/WhiteNoise, so HTTPS redirects and static
+# files skip CORS processing, but before CommonMiddleware so it can answer
+# OPTIONS preflights itself
+if ENABLE_CORS:
+    INSTALLED_APPS.insert(0, 'corsheaders')                           # Enables Cross-Origin Resource Sharing
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("whitenoise.middleware.WhiteNoiseMiddleware") + 1,
+        "corsheaders.middleware.CorsMiddleware",                      # Handle CORS headers
+    )
+
+# ---------------- Caching ----------------
+
+# Shared Redis cache when REDIS_URL is set (required for cache invalidation to
+# reach every worker); per-process memory cache otherwise, e.g. in development.
+# invalidate() only clears the local process's LocMem copy, so the cached
+# /history/ and /logs/ bodies are only used with the shared backend; without
+# it those listings are streamed from the database on every request
+RESPONSE_CACHE_ENABLED = bool(os.getenv("REDIS_URL"))
+
+if RESPONSE_CACHE_ENABLED:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "TIMEOUT": 60,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": 60,
+        }
+    }
+
+# Optional whole-response cache for anonymous GETs; responses may be up to
+# CACHE_MIDDLEWARE_SECONDS stale after a write
+if os.getenv("ENABLE_HTTP_CACHE", "False") == "True":
+    MIDDLEWARE.insert(0, "django.middleware.cache.UpdateCacheMiddleware")
+    MIDDLEWARE.append("django.middleware.cache.FetchFromCacheMiddleware")
+    CACHE_MIDDLEWARE_SECONDS = 30
+    CACHE_MIDDLEWARE_KEY_PREFIX = "inv"
+
 # ---------------- URL and Template Configuration ----------------
 
 # Main URL configuration file
 ROOT_URLCONF = "inventory_project.urls"
 
 # Template rendering configuration
+# With no explicit "loaders", Django (4.1+) wraps the filesystem and
+# app-directories loaders in the cached loader, so templates are compiled
+# once per process (and reloaded on change under runserver)
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -71,53 +145,108 @@ TEMPLATES = [
             "context_processors": [
                 "django.template.context_processors.request",  # Adds 'request' to template context
                 "django.contrib.auth.context_processors.auth", # Adds 'user' to template context
-                "django.contrib.messages.context_processors.messages",  # Adds 'messages'
             ],
         },
     },
 ]
 
+if ENABLE_MESSAGES:
+    TEMPLATES[0]["OPTIONS"]["context_processors"].append(
+        "django.contrib.messages.context_processors.messages"  # Adds 'messages'
+    )
+
 # Entry point for WSGI-compatible web servers
 WSGI_APPLICATION = "inventory_project.wsgi.application"
 
 # ---------------- Database Configuration ----------------
 
-# Uses DATABASE_URL 
+# Uses DATABASE_URL; connections are kept open for DB_CONN_MAX_AGE seconds
+# and reused across requests instead of reconnecting every time.
+# The URL is parsed once when Django first imports this module (once per
+# process); a memoizing wrapper defined here would be recreated by any
+# re-execution of the module, so it couldn't save a re-parse
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv("DATABASE_URL"))
+    'default': dj_database_url.config(
+        default=os.getenv("DATABASE_URL"),
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        conn_health_checks=True,
+    )
 }
 
+# Views run in autocommit; don't wrap every request in a transaction
+DATABASES['default'].setdefault('ATOMIC_REQUESTS', False)
+
+# Keep pooled PostgreSQL sockets alive so idle connections aren't dropped by
+# NATs/load balancers, and require TLS outside local development
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'keepalives': 1,
+        'keepalives_idle': 30,
+    })
+    if PROD:
+        DATABASES['default']['OPTIONS'].setdefault('sslmode', 'require')
+
+# Write product action logs and scan history from a background thread in
+# batches instead of inserting one row per request (entries still queued on
+# a crash are lost)
+ASYNC_LOG_WRITES = os.getenv("ASYNC_LOG_WRITES", "False") == "True"
+
 # ---------------- Static Files ----------------
 
 # URL path to access static files (CSS, JS, images)
 STATIC_URL = "/static/"
 
 # Directory to collect static files for production
-STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Hashed, pre-compressed (gzip) static files served by WhiteNoise;
+# hashed names are sent with far-future cache headers
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# ---------------- Sessions ----------------
+
+# Keep session data in a signed cookie instead of the django_session table,
+# so authenticated requests don't read/write the database for the session
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
 
 # ---------------- Security Settings for Production ----------------
 
 # Use secure cookies and HTTPS in production
-SESSION_COOKIE_SECURE = not DEBUG
-CSRF_COOKIE_SECURE = not DEBUG
-SESSION_COOKIE_SAMESITE = 'None' if not DEBUG else 'Lax'
-CSRF_COOKIE_SAMESITE = 'None' if not DEBUG else 'Lax'
-SECURE_SSL_REDIRECT = not DEBUG  # Redirect all HTTP requests to HTTPS
+SESSION_COOKIE_SECURE = CSRF_COOKIE_SECURE = PROD
+SESSION_COOKIE_SAMESITE = CSRF_COOKIE_SAMESITE = 'None' if PROD else 'Lax'
+SECURE_SSL_REDIRECT = PROD  # Redirect all HTTP requests to HTTPS
+
+# Tell browsers to stay on HTTPS for a year once they've seen the site
+SECURE_HSTS_SECONDS = 31536000 if PROD else 0
+SECURE_HSTS_INCLUDE_SUBDOMAINS = PROD
+
+# TLS is terminated by the hosting proxy; trust its forwarded scheme so
+# already-secure requests aren't redirected again
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 # ---------------- Password Validation ----------------
 
-AUTH_PASSWORD_VALIDATORS = [
-    {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
-    {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
-    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
-    {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
-]
+# Workers that never create users or set passwords can set
+# ENABLE_PW_VALIDATION=False to skip loading the common-password list;
+# keep it enabled wherever users are created (admin, createsuperuser)
+if os.getenv("ENABLE_PW_VALIDATION", "True") == "True":
+    AUTH_PASSWORD_VALIDATORS = [
+        {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+        {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+        {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+        {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
+    ]
+else:
+    AUTH_PASSWORD_VALIDATORS = []
 
 # ---------------- Internationalization ----------------
 
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
-USE_I18N = True
+USE_I18N = False  # English-only; skips translation machinery (no LocaleMiddleware either)
 USE_TZ = True
 
 # Default type for auto-created primary keys
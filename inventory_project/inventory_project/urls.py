@@ -1,6 +1,6 @@
 #inventory_project/inventory_project/urls.py
 
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from django.urls import include
 from inventory.views import home
@@ -8,6 +8,9 @@ from inventory.views import home
 
 urlpatterns = [
     path('', home), 
-    path('admin/', admin.site.urls),
     path('api/', include('inventory.urls'))
 ]
+
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+    urlpatterns.insert(1, path('admin/', admin.site.urls))
@@ -3,6 +3,10 @@ WSGI config for inventory_project project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Settings import performs no network or database access, so the app can be
+loaded once in the gunicorn master with ``--preload`` and shared with the
+forked workers copy-on-write.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """